@@ -3,16 +3,19 @@
 Card draw + reveal module (robust).
 - send_card_prompt(app): draw/reuse today's card and ANNOUNCE the draw only.
 - send_card_reveal(app): reveal the SAME persisted card in a boxed monospace layout to both CHAT_ID and CHAT_ID_HER.
-Persistence: TODAY_CARD_FILE stored in V30X_DATA_DIR (or ~/.vison30x).
+Both recipients are messaged concurrently.
+Persistence: TODAY_CARD_FILE stored in V30X_DATA_DIR (or ~/.vison30x); file IO runs in a worker thread.
 """
 
 from __future__ import annotations
 
 import os
+import asyncio
 import json
 import logging
 import random
 import textwrap
+import threading
 from datetime import datetime
 from pathlib import Path
 from html import escape
@@ -35,6 +38,9 @@ RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
 CARDS_FILE = READONLY_DATA_DIR / "cards.json"
 TODAY_CARD_FILE = RUNTIME_DIR / "today_card.json"
 
+# Guards the load -> reuse-or-pick -> save sequence for today's card
+_card_lock = threading.Lock()
+
 # ----------------------------
 # Helpers: tz-aware today iso
 # ----------------------------
@@ -109,6 +115,42 @@ def pick_random_card(cards: list) -> Optional[dict]:
     return random.choice(cards)
 
 
+def resolve_today_card(draw: bool) -> Optional[dict]:
+    """
+    Return today's persisted card, or pick one if none is stored for today.
+    draw=True (prompt) persists the new pick; the reveal falls back to an unsaved random card.
+    Runs as one step under _card_lock so overlapping calls never draw two different cards.
+    """
+    with _card_lock:
+        cards = load_cards()
+        if not cards:
+            logging.error("[Cards] No cards available to %s.", "draw" if draw else "reveal")
+            return None
+
+        today = _today_local_date_iso()
+        state = load_today_card_state()
+        chosen_card = None
+
+        # reuse if persisted
+        if state and state.get("date") == today:
+            card_id = state.get("id")
+            chosen_card = next((c for c in cards if c.get("title") == card_id or c.get("id") == card_id), None)
+            if chosen_card and draw:
+                logging.info("[Cards] Reusing persisted today card: %s", card_id)
+
+        if chosen_card:
+            return chosen_card
+
+        chosen_card = pick_random_card(cards)
+        if draw:
+            card_identifier = chosen_card.get("id") if chosen_card.get("id") is not None else chosen_card.get("title")
+            save_today_card_state({"date": today, "id": card_identifier})
+            logging.info("[Cards] Drew and persisted today card: %s", card_identifier)
+        else:
+            logging.warning("[Cards] No persisted today card found at reveal time — picking random for reveal.")
+        return chosen_card
+
+
 # ----------------------------
 # Robust env access (fallback to project .env)
 # ----------------------------
@@ -146,6 +188,27 @@ def _norm_chat_id(v: Optional[str]) -> Optional[int]:
         return None
 
 
+# ----------------------------
+# Fan-out to both recipients
+# ----------------------------
+async def _send_one(app, label: str, chat: int, action: str, **kwargs) -> None:
+    try:
+        await app.bot.send_message(chat_id=chat, **kwargs)
+        logging.info("[Cards] %s to %s (%s).", action, label, chat)
+    except Exception as e:
+        logging.exception("[Cards] %s failed for %s (%s): %s", action, label, chat, e)
+
+
+async def _send_to_both(app, chat_me_id: Optional[int], chat_her_id: Optional[int], action: str, **kwargs) -> None:
+    """Send the same message to every configured chat concurrently; failures are logged per chat."""
+    sends = [
+        _send_one(app, label, chat, action, **kwargs)
+        for label, chat in (("CHAT_ID", chat_me_id), ("CHAT_ID_HER", chat_her_id))
+        if chat
+    ]
+    await asyncio.gather(*sends)
+
+
 # ----------------------------
 # Boxed card renderer (monospace)
 # ----------------------------
@@ -205,31 +268,9 @@ async def send_card_prompt(app):
     The actual card content is not shown here; it's kept for the reveal.
     """
     try:
-        cards = load_cards()
-        if not cards:
-            logging.error("[Cards] No cards available to draw.")
-            return
-
-        today = _today_local_date_iso()
-        state = load_today_card_state()
-        chosen_card = None
-
-        # reuse if persisted
-        if state and state.get("date") == today:
-            card_id = state.get("id")
-            chosen_card = next((c for c in cards if c.get("title") == card_id or c.get("id") == card_id), None)
-            if chosen_card:
-                logging.info("[Cards] Reusing persisted today card: %s", card_id)
-
-        # pick and persist if not found
+        chosen_card = await asyncio.to_thread(resolve_today_card, True)
         if not chosen_card:
-            chosen_card = pick_random_card(cards)
-            if not chosen_card:
-                logging.error("[Cards] Failed to pick a card.")
-                return
-            card_identifier = chosen_card.get("id") if chosen_card.get("id") is not None else chosen_card.get("title")
-            save_today_card_state({"date": today, "id": card_identifier})
-            logging.info("[Cards] Drew and persisted today card: %s", card_identifier)
+            return
 
         # Announce draw only (no content)
         announce_text = (
@@ -247,19 +288,7 @@ async def send_card_prompt(app):
             logging.error("[Cards] Neither CHAT_ID nor CHAT_ID_HER available to send announcement.")
             return
 
-        if chat_me_id:
-            try:
-                await app.bot.send_message(chat_id=chat_me_id, text=announce_text)
-                logging.info("[Cards] Announced draw to CHAT_ID (%s).", chat_me_id)
-            except Exception as e:
-                logging.exception("[Cards] Failed to announce draw to CHAT_ID (%s): %s", chat_me_id, e)
-
-        if chat_her_id:
-            try:
-                await app.bot.send_message(chat_id=chat_her_id, text=announce_text)
-                logging.info("[Cards] Announced draw to CHAT_ID_HER (%s).", chat_her_id)
-            except Exception as e:
-                logging.exception("[Cards] Failed to announce draw to CHAT_ID_HER (%s): %s", chat_her_id, e)
+        await _send_to_both(app, chat_me_id, chat_her_id, "Announced draw", text=announce_text)
 
     except Exception as e:
         logging.exception("[Cards] send_card_prompt error: %s", e)
@@ -274,22 +303,9 @@ async def send_card_reveal(app):
     using an HTML <pre> block so formatting is preserved in Telegram.
     """
     try:
-        cards = load_cards()
-        if not cards:
-            logging.error("[Cards] No cards available to reveal.")
-            return
-
-        today = _today_local_date_iso()
-        state = load_today_card_state()
-        chosen_card = None
-
-        if state and state.get("date") == today:
-            card_id = state.get("id")
-            chosen_card = next((c for c in cards if c.get("title") == card_id or c.get("id") == card_id), None)
-
+        chosen_card = await asyncio.to_thread(resolve_today_card, False)
         if not chosen_card:
-            chosen_card = pick_random_card(cards)
-            logging.warning("[Cards] No persisted today card found at reveal time — picking random for reveal.")
+            return
 
         title = chosen_card.get("title", "Your Card")
         message = chosen_card.get("message", "")
@@ -310,19 +326,7 @@ async def send_card_reveal(app):
             logging.error("[Cards] Neither CHAT_ID nor CHAT_ID_HER available to send reveal.")
             return
 
-        if chat_me_id:
-            try:
-                await app.bot.send_message(chat_id=chat_me_id, text=payload, parse_mode="HTML")
-                logging.info("[Cards] Revealed boxed card to CHAT_ID (%s).", chat_me_id)
-            except Exception as e:
-                logging.exception("[Cards] Failed to reveal boxed card to CHAT_ID (%s): %s", chat_me_id, e)
-
-        if chat_her_id:
-            try:
-                await app.bot.send_message(chat_id=chat_her_id, text=payload, parse_mode="HTML")
-                logging.info("[Cards] Revealed boxed card to CHAT_ID_HER (%s).", chat_her_id)
-            except Exception as e:
-                logging.exception("[Cards] Failed to reveal boxed card to CHAT_ID_HER (%s): %s", chat_her_id, e)
+        await _send_to_both(app, chat_me_id, chat_her_id, "Revealed boxed card", text=payload, parse_mode="HTML")
 
     except Exception as e:
         logging.exception("[Cards] send_card_reveal error: %s", e)
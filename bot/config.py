@@ -0,0 +1,34 @@
+# bot/config.py
+"""
+Process-wide configuration read from the environment.
+Lookups are cached after the first successful call, so load .env before using them.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+
+
+@functools.cache
+def bot_token() -> str:
+    token = os.getenv("BOT_TOKEN")
+    if not token:
+        raise RuntimeError("BOT_TOKEN missing in .env")
+    return token
+
+
+@functools.cache
+def chat_id() -> int:
+    raw = os.getenv("CHAT_ID")
+    if not raw:
+        raise RuntimeError("CHAT_ID missing in .env")
+    return int(raw)
+
+
+@functools.cache
+def chat_id_her() -> int:
+    raw = os.getenv("CHAT_ID_HER")
+    if not raw:
+        raise RuntimeError("CHAT_ID_HER missing in .env")
+    return int(raw)
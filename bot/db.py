@@ -4,6 +4,7 @@ from __future__ import annotations
 import sqlite3
 import os
 import pathlib
+import threading
 from datetime import datetime, date
 from typing import Optional, Tuple
 
@@ -20,11 +21,49 @@ pathlib.Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
 # ---------------------------------------------------------------------
 # Connection helper (SINGLE source of truth)
 # ---------------------------------------------------------------------
+_wal_ready = False
+
+def _configure(conn: sqlite3.Connection) -> None:
+    global _wal_ready
+    conn.row_factory = sqlite3.Row
+    # journal_mode is persistent in the DB file; set it once per process
+    if not _wal_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_ready = True
+    # Per-connection: WAL appends without fsync per commit, wait on writer locks
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
 def connect() -> sqlite3.Connection:
     conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-    conn.row_factory = sqlite3.Row
+    _configure(conn)
     return conn
 
+# ---------------------------------------------------------------------
+# Shared connection (reused across calls and threads)
+# ---------------------------------------------------------------------
+_shared_conn: Optional[sqlite3.Connection] = None
+_shared_init_lock = threading.Lock()
+
+# Hold while using the shared connection; sqlite3 objects aren't thread-safe
+shared_lock = threading.Lock()
+
+def get_shared_conn() -> sqlite3.Connection:
+    """Process-wide autocommit connection, opened and configured once."""
+    global _shared_conn
+    with _shared_init_lock:
+        if _shared_conn is None:
+            conn = sqlite3.connect(
+                DB_PATH,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            _configure(conn)
+            _shared_conn = conn
+        return _shared_conn
+
 # ---------------------------------------------------------------------
 # Init DB schema (idempotent)
 # ---------------------------------------------------------------------
@@ -85,4 +124,12 @@ def init_db():
           recipient TEXT NOT NULL,
           ack TEXT
         );
+
+        -- Manifestation ids used in the current rotation cycle, per recipient
+        CREATE TABLE IF NOT EXISTS used_manifestations (
+          recipient TEXT NOT NULL,
+          mf_id TEXT NOT NULL,
+          used_on DATE,
+          PRIMARY KEY (recipient, mf_id)
+        );
         """)
@@ -1,19 +1,20 @@
 # bot/handlers.py
 
+import asyncio
 import logging
 import os
 from datetime import datetime
 from pathlib import Path
-import pytz
+from zoneinfo import ZoneInfo
 
 from telegram import Update
 from telegram.ext import CommandHandler, ContextTypes, Application
 
 from bot.manifestation import send_manifestation
-from bot.manifestation_for_her import send_manifestation_for_her
+from bot.manifestation_for_her import send_manifestation_for_her, clear_used_ids as clear_used_ids_her
 from bot.cards import send_card_prompt, send_card_reveal
 
-TZ = pytz.timezone("Asia/Kolkata")
+TZ = ZoneInfo("Asia/Kolkata")
 
 # -------------------------------------------------------------------------
 # Core system handlers
@@ -55,9 +56,9 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def force_manifest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
-        await send_manifestation(context.application, 0)
-        await send_manifestation(context.application, 1)
-        await send_manifestation(context.application, 2)
+        # Lines of the sequence go out in order, one after another
+        for i in range(3):
+            await send_manifestation(context.application, i)
         await update.message.reply_text("Manifestations sent (you) ✅")
     except Exception as e:
         logging.exception("force_manifest error")
@@ -66,9 +67,9 @@ async def force_manifest(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def force_manifest_her(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
-        await send_manifestation_for_her(context.application, 0)
-        await send_manifestation_for_her(context.application, 1)
-        await send_manifestation_for_her(context.application, 2)
+        # Lines of the sequence go out in order, one after another
+        for i in range(3):
+            await send_manifestation_for_her(context.application, i)
         await update.message.reply_text("Manifestations sent (her) ✅")
     except Exception as e:
         logging.exception("force_manifest_her error")
@@ -115,6 +116,7 @@ async def clear_cache(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     data_dir = base_dir / "data"
 
     candidates = [
+        data_dir / "manifestation_state.json",
         data_dir / "used_manifestations.json",
         data_dir / "used_manifestations_for_her.json",
         data_dir / "today_manifestation.json",
@@ -130,6 +132,13 @@ async def clear_cache(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         except Exception as e:
             logging.warning(f"Failed to remove {f}: {e}")
 
+    # her rotation lives in SQLite now
+    try:
+        if await asyncio.to_thread(clear_used_ids_her) > 0:
+            removed.append("used_manifestations (her)")
+    except Exception as e:
+        logging.warning(f"Failed to clear used manifestations (her): {e}")
+
     if removed:
         await update.message.reply_text("Cleared cache: " + ", ".join(removed))
     else:
@@ -163,17 +172,22 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 # Registration
 # -------------------------------------------------------------------------
 
-def setup_handlers(app: Application) -> None:
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("health", health))
-    app.add_handler(CommandHandler("status", status))
+HANDLERS = (
+    ("start", start),
+    ("health", health),
+    ("status", status),
 
-    app.add_handler(CommandHandler("force_manifest", force_manifest))
-    app.add_handler(CommandHandler("force_manifest_her", force_manifest_her))
-    app.add_handler(CommandHandler("force_card", force_card))
-    app.add_handler(CommandHandler("force_reveal", force_reveal))
+    ("force_manifest", force_manifest),
+    ("force_manifest_her", force_manifest_her),
+    ("force_card", force_card),
+    ("force_reveal", force_reveal),
 
-    app.add_handler(CommandHandler("clear_cache", clear_cache))
-    app.add_handler(CommandHandler("help", help_command))
+    ("clear_cache", clear_cache),
+    ("help", help_command),
+)
+
+
+def setup_handlers(app: Application) -> None:
+    app.add_handlers([CommandHandler(name, fn, block=False) for name, fn in HANDLERS])
 
     logging.info("Handlers setup complete (core only).")
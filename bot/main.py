@@ -1,12 +1,21 @@
 # bot/main.py
-import os
 from pathlib import Path
 from dotenv import load_dotenv
-from telegram.ext import ApplicationBuilder
+from telegram.ext import AIORateLimiter, ApplicationBuilder
 
+from bot.config import bot_token
 from bot.handlers import setup_handlers
 from bot.scheduler import setup_jobs
 from bot.db import init_db
+from bot.reflection import flush_reflections
+
+# Telegram caps bot output at 30 msg/s; stay a little under it
+MAX_SENDS_PER_SECOND = 28
+
+
+async def _post_shutdown(app) -> None:
+    # Write reflections still queued since the last scheduled flush
+    flush_reflections()
 
 
 def main():
@@ -16,11 +25,16 @@ def main():
     # Init persistence (minimal state only)
     init_db()
 
-    token = os.getenv("BOT_TOKEN")
-    if not token:
-        raise RuntimeError("BOT_TOKEN missing in .env")
+    builder = ApplicationBuilder().token(bot_token()).post_shutdown(_post_shutdown)
+
+    # Pace all outbound API calls through one shared limiter
+    try:
+        builder = builder.rate_limiter(AIORateLimiter(overall_max_rate=MAX_SENDS_PER_SECOND))
+    except RuntimeError as e:
+        # aiolimiter missing (python-telegram-bot[rate-limiter] not installed)
+        print(f"⚠️ Rate limiter disabled: {e}")
 
-    app = ApplicationBuilder().token(token).build()
+    app = builder.build()
 
     # Register handlers
     setup_handlers(app)
@@ -4,17 +4,21 @@ Robust manifestation rotation with deterministic fallback.
 
 Behavior:
 - Prefer persisted rotation: uses V30X_DATA_DIR (or ~/.vison30x).
-- Persist today's chosen id in today_manifestation.json and used ids in used_manifestations.json.
+- Persist today's chosen id and the used ids (a bitmap, or a JSON list for ids unsuited to one)
+  together in manifestation_state.json
+  (one atomic write per pick).
 - If persistence fails or runtime dir is not writable, fallback to a deterministic choice:
-    index = sha256(f"{date_iso}_{CHAT_ID}") % N
+    index = blake3(f"{date_iso}|{CHAT_ID}") % N   (sha256 if blake3 is not installed)
   which changes per calendar day and CHAT_ID, ensuring no daily repeats.
 
 Keeps API:
 - async def send_manifestation(app, index: int)
+- async def get_today_manifestation_async()
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
 import json
 import random
@@ -25,53 +29,150 @@ from datetime import datetime, date
 from pathlib import Path
 from typing import Optional
 
+from bot.config import chat_id
 from bot.reflection import record_reflection
 
+# Optional: faster JSON via orjson (falls back to stdlib json)
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # type: ignore
+
+# Optional: SIMD-accelerated hashing via blake3 (falls back to sha256)
+try:
+    import blake3  # type: ignore
+except Exception:
+    blake3 = None  # type: ignore
+
 # ----------------------------
 # Paths & config
 # ----------------------------
 BASE_DIR = Path(__file__).resolve().parent
 READONLY_DATA_DIR = BASE_DIR / "data"  # manifestations.json (repo)
 RUNTIME_DIR = Path(os.getenv("V30X_DATA_DIR", Path.home() / ".vison30x"))
-RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
 
 MANIFESTATIONS_FILE = READONLY_DATA_DIR / "manifestations.json"
-USED_FILE = RUNTIME_DIR / "used_manifestations.json"
+STATE_FILE = RUNTIME_DIR / "manifestation_state.json"
+# Pre-merge state files, read only until the first combined save
+LEGACY_USED_FILE = RUNTIME_DIR / "used_manifestations.json"
 TODAY_FILE = RUNTIME_DIR / "today_manifestation.json"
 
 TZ_NAME = os.getenv("V30X_TZ", "Asia/Kolkata")
 
+try:
+    from zoneinfo import ZoneInfo
+    _TZ = ZoneInfo(TZ_NAME)
+except Exception:
+    _TZ = None
+
+# Open flags for state writes (both are 0 where unsupported)
+_O_DSYNC = getattr(os, "O_DSYNC", 0)
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
 _lock = threading.Lock()
+_async_lock = asyncio.Lock()
+_dir_ready = False
 _cached_date: Optional[date] = None
 _cached_manifestation: Optional[dict] = None
 
+# Parsed manifestations.json, reused until the file's mtime changes
+_mans_cache: list = []
+_mans_mtime: Optional[int] = None
+_mans_by_id: dict[int, dict] = {}
+
 # ----------------------------
 # Utilities
 # ----------------------------
 def _today_local_date() -> date:
+    return datetime.now(_TZ).date() if _TZ else datetime.now().date()
+
+def _json_loads(raw: bytes):
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_dumps(obj) -> bytes:
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def _fsync_dir(path: Path) -> None:
+    # Persist the rename itself; directories can't be opened this way on Windows
     try:
-        from zoneinfo import ZoneInfo
-        return datetime.now(ZoneInfo(TZ_NAME)).date()
-    except Exception:
-        return datetime.now().date()
+        fd = os.open(str(path), os.O_DIRECTORY)
+    except (OSError, AttributeError):
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
-def _atomic_write(path: Path, obj) -> None:
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    global _dir_ready
+    if not _dir_ready:
+        # Created on first write rather than at import
+        RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+        _dir_ready = True
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-    tmp.replace(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY
+    # With O_DSYNC the write only returns once data is on disk; otherwise fsync
+    try:
+        fd = os.open(str(tmp), flags | _O_DSYNC, 0o644)
+        synced = bool(_O_DSYNC)
+    except OSError:
+        fd = os.open(str(tmp), flags, 0o644)
+        synced = False
+    try:
+        # os.write may write fewer bytes than asked; never rename a partial file
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if not synced:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+def _atomic_write(path: Path, obj) -> None:
+    _atomic_write_bytes(path, _json_dumps(obj))
+
+# A bitmap is only used while every id is in [0, _BITMAP_SLACK * pool size];
+# negative, huge or non-int ids are stored as a plain JSON list instead
+_BITMAP_SLACK = 8
+
+def _bitmap_ok(ids: set[int]) -> bool:
+    bound = _BITMAP_SLACK * max(len(_mans_by_id), 1)
+    return all(type(i) is int and 0 <= i <= bound for i in ids)
+
+def _ids_to_bitmap(ids: set[int]) -> bytes:
+    bits = bytearray(-(-(max(ids, default=-1) + 1) // 8))
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return bytes(bits)
+
+def _bitmap_to_ids(bits: bytes) -> set[int]:
+    return {(n << 3) | b for n, byte in enumerate(bits) if byte for b in range(8) if byte >> b & 1}
 
 # ----------------------------
 # Load manifest list
 # ----------------------------
 def load_manifestations() -> list:
+    global _mans_cache, _mans_mtime, _mans_by_id
     try:
-        with MANIFESTATIONS_FILE.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            if not isinstance(data, list):
-                logging.error("[Manifestation] manifestations.json malformed (not list).")
-                return []
-            return data
+        mtime = os.stat(MANIFESTATIONS_FILE).st_mtime_ns
+        if mtime == _mans_mtime:
+            return _mans_cache
+        data = _json_loads(MANIFESTATIONS_FILE.read_bytes())
+        if not isinstance(data, list):
+            logging.error("[Manifestation] manifestations.json malformed (not list).")
+            return []
+        _mans_cache = data
+        _mans_by_id = {int(m.get("id")): m for m in data}
+        _mans_mtime = mtime
+        return data
     except Exception as e:
         logging.exception("[Manifestation] Failed to load manifestations.json: %s", e)
         return []
@@ -80,35 +181,57 @@ def load_manifestations() -> list:
 # Persistence helpers
 # ----------------------------
 def load_used_ids() -> set[int]:
-    if not USED_FILE.exists():
-        return set()
+    # Older installs kept a JSON list; read it until the first combined save
     try:
-        with USED_FILE.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
-            return set(int(x) for x in raw)
+        if LEGACY_USED_FILE.exists():
+            return set(map(int, _json_loads(LEGACY_USED_FILE.read_bytes())))
+        return set()
     except Exception as e:
-        logging.warning("[Manifestation] Failed to load used ids (%s): %s", USED_FILE, e)
+        logging.warning("[Manifestation] Failed to load used ids (%s): %s", LEGACY_USED_FILE, e)
         return set()
 
-def save_used_ids_safe(used_ids: set[int]) -> bool:
-    try:
-        _atomic_write(USED_FILE, sorted(list(used_ids)))
-        return True
-    except Exception:
-        return False
-
 def load_today_state() -> Optional[dict]:
     if not TODAY_FILE.exists():
         return None
     try:
-        with TODAY_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        return _json_loads(TODAY_FILE.read_bytes())
     except Exception:
         return None
 
-def save_today_state_safe(state: dict) -> bool:
+def load_state() -> dict:
+    """Return {'date': 'YYYY-MM-DD' | None, 'today_id': int | None, 'used': set[int]}."""
+    if not STATE_FILE.exists():
+        today = load_today_state() or {}
+        return {"date": today.get("date"), "today_id": today.get("id"), "used": load_used_ids()}
+    try:
+        raw = _json_loads(STATE_FILE.read_bytes())
+        return {
+            "date": raw.get("date"),
+            "today_id": raw.get("today_id"),
+            "used": _decode_used(raw.get("used", "")),
+        }
+    except Exception as e:
+        logging.warning("[Manifestation] Failed to load state (%s): %s", STATE_FILE, e)
+        return {"date": None, "today_id": None, "used": set()}
+
+def _encode_used(ids: set[int]):
+    # hex bitmap string, or a sorted id list when the ids don't suit a bitmap
+    if _bitmap_ok(ids):
+        return _ids_to_bitmap(ids).hex()
+    return sorted(ids)
+
+def _decode_used(raw) -> set[int]:
+    if isinstance(raw, list):
+        return set(map(int, raw))
+    return _bitmap_to_ids(bytes.fromhex(raw))
+
+def save_state_safe(state: dict) -> bool:
     try:
-        _atomic_write(TODAY_FILE, state)
+        _atomic_write(STATE_FILE, {
+            "date": state["date"],
+            "today_id": state["today_id"],
+            "used": _encode_used(state["used"]),
+        })
         return True
     except Exception:
         return False
@@ -119,22 +242,29 @@ def save_today_state_safe(state: dict) -> bool:
 def deterministic_choice_by_date(manifestations: list, salt: str = "") -> dict:
     today = _today_local_date().isoformat()
     key = f"{today}|{salt}"
-    h = hashlib.sha256(key.encode("utf-8")).digest()
-    idx = int.from_bytes(h[:8], "big") % len(manifestations)
+    if blake3:
+        h = blake3.blake3(key.encode("utf-8")).digest(8)
+    else:
+        h = hashlib.sha256(key.encode("utf-8")).digest()[:8]
+    idx = int.from_bytes(h, "big") % len(manifestations)
     return manifestations[idx]
 
 # ----------------------------
 # Normal pick with persistence
 # ----------------------------
 def pick_new_manifestation(manifestations: list, used_ids: set[int]) -> dict:
-    unused = [m for m in manifestations if int(m.get("id")) not in used_ids]
+    # Reuse the id index built by load_manifestations() when given the cached list
+    if manifestations is _mans_cache:
+        by_id = _mans_by_id
+    else:
+        by_id = {int(m.get("id")): m for m in manifestations}
+    unused = [mid for mid in by_id if mid not in used_ids]
     if not unused:
         used_ids.clear()
-        unused = manifestations
-    chosen = random.choice(unused)
-    used_ids.add(int(chosen.get("id")))
-    save_used_ids_safe(used_ids)
-    return chosen
+        unused = list(by_id)
+    chosen_id = random.choice(unused)
+    used_ids.add(chosen_id)
+    return by_id[chosen_id]
 
 # ----------------------------
 # Public function: get today's manifestation
@@ -150,18 +280,18 @@ def get_today_manifestation() -> Optional[dict]:
         if not mans:
             return None
 
-        state = load_today_state()
-        if state and state.get("date") == today.isoformat():
-            chosen = next((m for m in mans if int(m.get("id")) == int(state.get("id"))), None)
+        state = load_state()
+        if state["date"] == today.isoformat() and state["today_id"] is not None:
+            chosen = _mans_by_id.get(int(state["today_id"]))
             if chosen:
                 _cached_date = today
                 _cached_manifestation = chosen
                 return chosen
 
         try:
-            used_ids = load_used_ids()
+            used_ids = state["used"]
             chosen = pick_new_manifestation(mans, used_ids)
-            save_today_state_safe({"date": today.isoformat(), "id": int(chosen.get("id"))})
+            save_state_safe({"date": today.isoformat(), "today_id": int(chosen.get("id")), "used": used_ids})
         except Exception:
             chosen = deterministic_choice_by_date(mans, salt=os.getenv("CHAT_ID", ""))
 
@@ -169,11 +299,18 @@ def get_today_manifestation() -> Optional[dict]:
         _cached_manifestation = chosen
         return chosen
 
+async def get_today_manifestation_async() -> Optional[dict]:
+    """Coalesce concurrent callers into a single selection pass off the event loop."""
+    async with _async_lock:
+        if _cached_date == _today_local_date() and _cached_manifestation is not None:
+            return _cached_manifestation
+        return await asyncio.to_thread(get_today_manifestation)
+
 # ----------------------------
 # Bot send function
 # ----------------------------
 async def send_manifestation(app, index: int):
-    manifestation = get_today_manifestation()
+    manifestation = await get_today_manifestation_async()
     if not manifestation:
         return
 
@@ -182,10 +319,9 @@ async def send_manifestation(app, index: int):
         return
 
     line = the_set[index]
-    chat_id = int(os.getenv("CHAT_ID"))
 
     await app.bot.send_message(
-        chat_id=chat_id,
+        chat_id=chat_id(),
         text=f"🌅 Manifestation:\n\n{line}"
     )
 
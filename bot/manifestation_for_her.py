@@ -1,73 +1,163 @@
 # bot/manifestation_for_her.py
+import asyncio
 import os
 import json
 import random
 import logging
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import bot.db as db
+from bot.config import chat_id_her
 from bot.reflection import record_reflection
 
+# Optional: faster JSON via orjson (falls back to stdlib json)
+try:
+    import orjson  # type: ignore
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 MANIFESTATIONS_FILE = DATA_DIR / "manifestations_for_her.json"
-USED_FILE = DATA_DIR / "used_manifestations_for_her.json"
+LEGACY_USED_FILE = DATA_DIR / "used_manifestations_for_her.json"  # imported into SQLite once
+RECIPIENT = "her"
 
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Bot timezone (None = system local time); same V30X_TZ as bot.manifestation
+try:
+    from zoneinfo import ZoneInfo
+    _TZ = ZoneInfo(os.getenv("V30X_TZ", "Asia/Kolkata"))
+except Exception:
+    _TZ = None
+
+# Parsed file contents, reused while the file's mtime is unchanged
+_mf_cache = {"mtime": None, "data": None, "by_id": {}, "all_ids": frozenset()}
+
 def load_manifestations():
     try:
-        with open(MANIFESTATIONS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        mt = MANIFESTATIONS_FILE.stat().st_mtime_ns
+        if mt == _mf_cache["mtime"]:
+            return _mf_cache["data"]
+        with open(MANIFESTATIONS_FILE, "rb") as f:
+            data = _loads(f.read())
+        by_id = {str(m["id"]): m for m in data}
+        _mf_cache.update(mtime=mt, data=data, by_id=by_id, all_ids=frozenset(by_id))
+        return data
     except Exception:
         return []
 
-def load_used_ids():
-    if not USED_FILE.exists():
-        return set()
+# Used ids live in SQLite (used_manifestations): one INSERT per pick, one DELETE per cycle.
+# mf_id is TEXT, so ids are compared as str(m["id"]) everywhere.
+def _import_legacy_used_ids(conn):
+    if not LEGACY_USED_FILE.exists():
+        return
     try:
-        with open(USED_FILE, "r", encoding="utf-8") as f:
-            return set(json.load(f))
-    except Exception:
-        return set()
+        with open(LEGACY_USED_FILE, "rb") as f:
+            ids = _loads(f.read())
+        conn.executemany(
+            "INSERT OR IGNORE INTO used_manifestations (recipient, mf_id) VALUES (?, ?)",
+            [(RECIPIENT, str(mid)) for mid in ids],
+        )
+        LEGACY_USED_FILE.unlink()
+    except Exception as e:
+        logging.warning("[ManifestationHer] Failed to import %s: %s", LEGACY_USED_FILE, e)
+
+def load_used_ids():
+    conn = db.get_shared_conn()
+    with db.shared_lock:
+        _import_legacy_used_ids(conn)
+        rows = conn.execute(
+            "SELECT mf_id FROM used_manifestations WHERE recipient = ?", (RECIPIENT,)
+        ).fetchall()
+    return {r[0] for r in rows}
 
-def save_used_ids(used_ids):
-    with open(USED_FILE, "w", encoding="utf-8") as f:
-        json.dump(sorted(list(used_ids)), f, indent=2)
+def mark_used(mf_id, used_on, new_cycle=False):
+    """Record mf_id as used; new_cycle first forgets the previous (exhausted) cycle."""
+    conn = db.get_shared_conn()
+    with db.shared_lock:
+        conn.execute("BEGIN")
+        try:
+            if new_cycle:
+                conn.execute("DELETE FROM used_manifestations WHERE recipient = ?", (RECIPIENT,))
+            conn.execute(
+                "INSERT OR IGNORE INTO used_manifestations (recipient, mf_id, used_on) VALUES (?, ?, ?)",
+                (RECIPIENT, str(mf_id), used_on),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def clear_used_ids():
+    """Forget her used ids; returns the number of rows removed."""
+    conn = db.get_shared_conn()
+    with db.shared_lock:
+        cur = conn.execute("DELETE FROM used_manifestations WHERE recipient = ?", (RECIPIENT,))
+        return cur.rowcount
 
 def pick_new_manifestation(manifestations, used_ids):
-    unused = [m for m in manifestations if m["id"] not in used_ids]
-    if not unused:
+    if manifestations is _mf_cache["data"]:
+        by_id, all_ids = _mf_cache["by_id"], _mf_cache["all_ids"]
+    else:
+        by_id = {str(m["id"]): m for m in manifestations}
+        all_ids = frozenset(by_id)
+    candidates = all_ids - used_ids
+    if not candidates:
         used_ids.clear()
-        unused = manifestations
-    chosen = random.choice(unused)
-    used_ids.add(chosen["id"])
-    save_used_ids(used_ids)
-    return chosen
+        candidates = all_ids
+    chosen_id = random.choice(tuple(candidates))
+    used_ids.add(chosen_id)
+    return by_id[chosen_id]
+
+def _local_day(now):
+    """Return (local date, epoch of its midnight, epoch of the next midnight); DST-aware."""
+    today = datetime.fromtimestamp(now, _TZ).date()
+    start = datetime.combine(today, datetime.min.time(), tzinfo=_TZ)
+    end = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=_TZ)
+    return today, int(start.timestamp()), int(end.timestamp())
 
+_lock = threading.Lock()
 _cached_today = None
+# Epoch bounds of _cached_today; the fast path is two integer compares
+_day_start = _day_end = 0
 _cached_manifestation = None
 
 def get_today_manifestation():
-    global _cached_today, _cached_manifestation
-    today = datetime.now().date()
-    if _cached_today != today:
-        _cached_manifestation = pick_new_manifestation(
-            load_manifestations(),
-            load_used_ids()
-        )
-        _cached_today = today
-    return _cached_manifestation
+    global _cached_today, _day_start, _day_end, _cached_manifestation
+    with _lock:
+        now = int(time.time())
+        if _day_start <= now < _day_end:
+            return _cached_manifestation
+        today, start, end = _local_day(now)
+        if _cached_today != today:
+            used_ids = load_used_ids()
+            used_before = len(used_ids)
+            _cached_manifestation = pick_new_manifestation(load_manifestations(), used_ids)
+            # pick_new_manifestation() clears used_ids once every id has been used
+            mark_used(
+                _cached_manifestation["id"],
+                today.isoformat(),
+                new_cycle=len(used_ids) <= used_before,
+            )
+            _cached_today = today
+        _day_start, _day_end = start, end
+        return _cached_manifestation
 
 async def send_manifestation_for_her(app, index):
-    manifestation = get_today_manifestation()
+    # Selection reads and writes SQLite; keep that off the event loop
+    manifestation = await asyncio.to_thread(get_today_manifestation)
     if not manifestation or index >= len(manifestation.get("set", [])):
         return
 
     line = manifestation["set"][index]
 
     await app.bot.send_message(
-        chat_id=int(os.getenv("CHAT_ID_HER")),
+        chat_id=chat_id_her(),
         text=f"🌅 Manifestation for Her:\n\n{line}"
     )
 
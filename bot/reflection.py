@@ -1,5 +1,7 @@
 # bot/reflection.py
 from __future__ import annotations
+import logging
+import threading
 from datetime import datetime
 from typing import Literal, Optional
 
@@ -8,6 +10,17 @@ import bot.db as db
 ReflectionType = Literal["manifestation", "card"]
 RecipientType = Literal["me", "her"]
 
+# Same SQL text every flush, so sqlite3's per-connection statement cache reuses it
+_INSERT_REFLECTION = """
+    INSERT INTO reflection_artifacts
+    (timestamp, type, payload_id, recipient, ack)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# Rows waiting for the next flush_reflections() (timestamp, type, payload_id, recipient, ack)
+_pending: list[tuple] = []
+_pending_lock = threading.Lock()
+
 def record_reflection(
     reflection_type: ReflectionType,
     payload_id: str,
@@ -16,15 +29,41 @@ def record_reflection(
 ) -> None:
     """
     Append-only reflection artifact.
+    Queued in memory; written by the next flush_reflections().
     """
     ts = datetime.utcnow().isoformat()
 
-    with db.connect() as conn:
-        conn.execute(
-            """
-            INSERT INTO reflection_artifacts
-            (timestamp, type, payload_id, recipient, ack)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (ts, reflection_type, payload_id, recipient, ack),
-        )
+    with _pending_lock:
+        _pending.append((ts, reflection_type, payload_id, recipient, ack))
+
+def has_pending_reflections() -> bool:
+    # Lock-free peek; a row appended right after this is picked up by the next flush
+    return bool(_pending)
+
+def flush_reflections() -> int:
+    """
+    Write all queued reflections in a single transaction.
+    Returns the number of rows written; on failure rows are re-queued.
+    """
+    global _pending
+    with _pending_lock:
+        rows, _pending = _pending, []
+    if not rows:
+        return 0
+
+    conn = db.get_shared_conn()
+    try:
+        with db.shared_lock:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(_INSERT_REFLECTION, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    except Exception as e:
+        logging.exception("[Reflection] Flush of %d rows failed: %s", len(rows), e)
+        with _pending_lock:
+            _pending[:0] = rows
+        return 0
+    return len(rows)
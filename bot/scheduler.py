@@ -9,19 +9,28 @@ Responsibilities:
 - Be defensive if optional modules/functions are missing (e.g. bot.reminders or for_her variants).
 """
 
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
+import asyncio
 import logging
-import pytz
 import os
+from zoneinfo import ZoneInfo
 
 from telegram.ext import Application, ContextTypes
 
 # Core actions from project (expected to exist)
-from bot.manifestation import send_manifestation
-from bot.manifestation_for_her import send_manifestation_for_her
+from bot.manifestation import send_manifestation, get_today_manifestation_async
+from bot.manifestation_for_her import send_manifestation_for_her, get_today_manifestation as get_today_manifestation_her
+import bot.cards as cards
 from bot.cards import send_card_prompt, send_card_reveal
+from bot.reflection import flush_reflections, has_pending_reflections
 
-TZ = pytz.timezone(os.getenv("V30X_TZ", "Asia/Kolkata"))
+TZ = ZoneInfo(os.getenv("V30X_TZ", "Asia/Kolkata"))
+
+# How often queued reflection artifacts are written to SQLite
+REFLECTION_FLUSH_SECONDS = 2
+
+# Today's manifestations are picked this long before the first send
+MANIFEST_PREPARE_LEAD = timedelta(minutes=1)
 
 # Optional reminders module (may not exist yet)
 try:
@@ -30,96 +39,75 @@ except Exception:
     send_reminder = None
     send_weekly_reminder = None
 
-# Helper to attempt calling a "for_her" variant if available otherwise fallback
+# Dedicated for-her variants, resolved once at import. None means the base
+# function already delivers to both CHAT_ID and CHAT_ID_HER (as bot.cards does).
+_FOR_HER = {
+    send_card_prompt: getattr(cards, "send_card_prompt_for_her", None),
+    send_card_reveal: getattr(cards, "send_card_reveal_for_her", None),
+}
+
 async def _call_maybe_for_her(func, app: Application, *, for_her: bool = False, **kwargs):
     """
-    Try to call func(app, **kwargs). If for_her True and func accepts a 'for_her' kw, pass it.
-    If an alternative function named func.__name__ + '_for_her' exists in same module, use it.
+    Call func(app, **kwargs), or its registered for-her variant when for_her is True.
+    Without a variant the for_her call is skipped so both chats aren't messaged twice.
     """
-    # If nothing to call, return
     if not func:
         logging.debug("_call_maybe_for_her: no function provided")
         return
 
-    # If caller specifically passed a 'for_her' kw, try that first
-    try:
-        # First try calling with for_her kw (if the function supports it)
-        kwargs_try = dict(kwargs)
-        if for_her:
-            kwargs_try["for_her"] = True
-        await func(app, **kwargs_try)
-        return
-    except TypeError:
-        # function doesn't accept for_her kw or some other signature difference; fallthrough
-        pass
-    except Exception as ex:
-        # Unexpected error while calling — log and return
-        logging.exception("Error calling function (first attempt): %s", ex)
-        return
-
-    # Next: attempt to locate sibling function named <name>_for_her in calling module
-    try:
-        module = func.__module__
-        name = func.__name__ + "_for_her"
-        mod = __import__(module, fromlist=[name])
-        alt = getattr(mod, name, None)
-        if alt:
-            await alt(app, **kwargs)
+    if for_her:
+        alt = _FOR_HER.get(func)
+        if not alt:
+            logging.debug("_call_maybe_for_her: %s already covers her; skipping", func.__name__)
             return
-    except Exception:
-        # ignore and fallback
-        pass
+        func = alt
 
-    # Final fallback: call same function without for_her (idempotent implementations should reuse stored state)
     try:
         await func(app, **kwargs)
     except Exception as ex:
-        logging.exception("Final fallback call failed: %s", ex)
+        logging.exception("Error calling %s: %s", func.__name__, ex)
 
 
 # -------------------------
 # Job callbacks
 # -------------------------
 
-# Manifestations (you) index callbacks
-async def _job_manifestation_0(context: ContextTypes.DEFAULT_TYPE) -> None:
-    await send_manifestation(context.application, 0)
-
-async def _job_manifestation_1(context: ContextTypes.DEFAULT_TYPE) -> None:
-    await send_manifestation(context.application, 1)
-
-async def _job_manifestation_2(context: ContextTypes.DEFAULT_TYPE) -> None:
-    await send_manifestation(context.application, 2)
-
-# Manifestations (her) index callbacks
-async def _job_manifestation_her_0(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def _send_manifestation_her(app: Application, idx: int) -> None:
     # prefer dedicated for-her function if present
     try:
-        await send_manifestation_for_her(context.application, 0)
+        await send_manifestation_for_her(app, idx)
     except Exception:
         # fallback to calling the normal send_manifestation (it may accept a for_her flag or be idempotent)
         try:
-            await send_manifestation(context.application, 0)
-        except Exception:
-            logging.exception("Failed to send manifestation for her (index 0)")
-
-async def _job_manifestation_her_1(context: ContextTypes.DEFAULT_TYPE) -> None:
-    try:
-        await send_manifestation_for_her(context.application, 1)
-    except Exception:
-        try:
-            await send_manifestation(context.application, 1)
+            await send_manifestation(app, idx)
         except Exception:
-            logging.exception("Failed to send manifestation for her (index 1)")
-
-async def _job_manifestation_her_2(context: ContextTypes.DEFAULT_TYPE) -> None:
-    try:
-        await send_manifestation_for_her(context.application, 2)
-    except Exception:
-        try:
-            await send_manifestation(context.application, 2)
-        except Exception:
-            logging.exception("Failed to send manifestation for her (index 2)")
+            logging.exception("Failed to send manifestation for her (index %s)", idx)
+
+# Pick today's manifestations (you + her) ahead of the first slot so the
+# slot sends only read the already-cached selection
+async def _job_prepare_manifestations(context: ContextTypes.DEFAULT_TYPE) -> None:
+    results = await asyncio.gather(
+        get_today_manifestation_async(),
+        asyncio.to_thread(get_today_manifestation_her),
+        return_exceptions=True,
+    )
+    for res in results:
+        if isinstance(res, Exception):
+            logging.error("Manifestation prepare failed: %r", res)
+
+# The two sends go to different chats, so they run together rather than staggered
+async def _send_manifestation_slot(app: Application, idx: int) -> None:
+    results = await asyncio.gather(send_manifestation(app, idx), _send_manifestation_her(app, idx), return_exceptions=True)
+    for res in results:
+        if isinstance(res, Exception):
+            logging.error("Manifestation send failed (index %s): %r", idx, res)
+
+# Manifestations: one callback per slot, sending to you and her concurrently
+async def _job_manifestation(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Expects context.job.data = {"idx": 0..2}.
+    """
+    await _send_manifestation_slot(context.application, context.job.data["idx"])
 
 # Card draw/reveal callbacks (for you + her via _call_maybe_for_her)
 async def _job_card_prompt(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -164,6 +152,14 @@ async def _job_send_weekly_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
         logging.exception("Weekly reminder job failed.")
 
 
+# Reflection writer: persist queued reflection artifacts in one transaction
+async def _job_flush_reflections(context: ContextTypes.DEFAULT_TYPE) -> None:
+    # Most ticks have nothing queued; skip the worker-thread hop for those
+    if not has_pending_reflections():
+        return
+    await asyncio.to_thread(flush_reflections)
+
+
 # -------------------------
 # Schedule registration
 # -------------------------
@@ -187,40 +183,28 @@ def _env_time(name: str, default_h: int, default_m: int) -> time:
 def setup_jobs(app: Application) -> None:
     """
     Register recurring jobs on PTB's JobQueue.
-    - Manifestations for you: three daily times (defaults 08:00 / 08:15 / 08:30)
-    - Manifestations for her: staggered by +1 minute by default
+    - Manifestations for you + her: picked a minute before the first slot, then sent together
+      at three daily times (defaults 08:00 / 08:15 / 08:30)
     - Card draw: 10:00 (default) draw + 19:00 reveal
     - Reminders: multiple daily slots and a weekly Sunday reminder
+    - Reflections: queued artifacts flushed to SQLite every few seconds
     """
     jq = app.job_queue
 
+    # --- reflection artifacts are batched in memory; flush them periodically ---
+    jq.run_repeating(_job_flush_reflections, interval=REFLECTION_FLUSH_SECONDS, name="reflection_flush")
+
     # --- manifest times configurable through env ---
     m0 = _env_time("MANIFEST_0", 8, 0)
     m1 = _env_time("MANIFEST_1", 8, 15)
     m2 = _env_time("MANIFEST_2", 8, 30)
 
-    # her offset (minutes). default 1 => 08:01/08:16/08:31
-    try:
-        her_offset = int(os.getenv("V30X_MANIFEST_HER_OFFSET", "1"))
-    except Exception:
-        her_offset = 1
+    prepare_time = (datetime.combine(date.today(), m0) - MANIFEST_PREPARE_LEAD).timetz()
+    jq.run_daily(_job_prepare_manifestations, prepare_time, name="manifestation_prepare")
 
-    # schedule your manifestations
-    jq.run_daily(_job_manifestation_0, m0, name="manifestation_0")
-    jq.run_daily(_job_manifestation_1, m1, name="manifestation_1")
-    jq.run_daily(_job_manifestation_2, m2, name="manifestation_2")
-
-    # her times (shift minutes by her_offset)
-    def _shift_time(t: time, mins: int) -> time:
-        # convert to datetime today then shift
-        now = datetime.now(TZ)
-        dt = TZ.localize(datetime(now.year, now.month, now.day, t.hour, t.minute, 0))
-        dt_shift = dt + timedelta(minutes=mins)
-        return time(hour=dt_shift.hour, minute=dt_shift.minute, tzinfo=TZ)
-
-    jq.run_daily(_job_manifestation_her_0, _shift_time(m0, her_offset), name="manifestation_her_0")
-    jq.run_daily(_job_manifestation_her_1, _shift_time(m1, her_offset), name="manifestation_her_1")
-    jq.run_daily(_job_manifestation_her_2, _shift_time(m2, her_offset), name="manifestation_her_2")
+    # one daily job per slot, so a restart mid-morning still sends the later slots
+    for idx, t in enumerate((m0, m1, m2)):
+        jq.run_daily(_job_manifestation, t, name=f"manifestation_{idx}", data={"idx": idx})
 
     # --- Cards (defaults can be configured) ---
     card_draw_time = _env_time("CARD_DRAW", 10, 0)
@@ -268,15 +252,9 @@ def schedule_one_off_manifestations_in(app: Application, minutes_from_now: int =
     jq = app.job_queue
     now = datetime.now(TZ)
     t0 = now + timedelta(minutes=minutes_from_now)
-    # you (0,1,2) spaced 0,1,2 minutes
-    jq.run_once(_job_manifestation_0, when=t0, name="test_manifestation_0")
-    jq.run_once(_job_manifestation_1, when=t0 + timedelta(minutes=1), name="test_manifestation_1")
-    jq.run_once(_job_manifestation_2, when=t0 + timedelta(minutes=2), name="test_manifestation_2")
-
-    # her (stagger a bit: offset 30s)
-    jq.run_once(_job_manifestation_her_0, when=t0 + timedelta(seconds=30), name="test_manifestation_her_0")
-    jq.run_once(_job_manifestation_her_1, when=t0 + timedelta(minutes=1, seconds=30), name="test_manifestation_her_1")
-    jq.run_once(_job_manifestation_her_2, when=t0 + timedelta(minutes=2, seconds=30), name="test_manifestation_her_2")
+    # you + her (0,1,2) spaced 0,1,2 minutes
+    for idx in range(3):
+        jq.run_once(_job_manifestation, when=t0 + timedelta(minutes=idx), name=f"test_manifestation_{idx}", data={"idx": idx})
 
     # also schedule card draw/reveal for test (draw at t0+3min, reveal at t0+4min)
     jq.run_once(_job_card_prompt, when=t0 + timedelta(minutes=3), name="test_card_prompt")
@@ -289,17 +267,12 @@ def schedule_one_off_at_clock_time(app: Application, hh: int, mm: int) -> None:
     """
     jq = app.job_queue
     now = datetime.now(TZ)
-    at = TZ.localize(datetime(now.year, now.month, now.day, hh, mm, 0))
+    at = datetime(now.year, now.month, now.day, hh, mm, 0, tzinfo=TZ)
     if at <= now:
         at = at + timedelta(days=1)
 
-    jq.run_once(_job_manifestation_0, when=at, name="at_manifestation_0")
-    jq.run_once(_job_manifestation_1, when=at + timedelta(minutes=1), name="at_manifestation_1")
-    jq.run_once(_job_manifestation_2, when=at + timedelta(minutes=2), name="at_manifestation_2")
-
-    jq.run_once(_job_manifestation_her_0, when=at + timedelta(seconds=30), name="at_manifestation_her_0")
-    jq.run_once(_job_manifestation_her_1, when=at + timedelta(minutes=1, seconds=30), name="at_manifestation_her_1")
-    jq.run_once(_job_manifestation_her_2, when=at + timedelta(minutes=2, seconds=30), name="at_manifestation_her_2")
+    for idx in range(3):
+        jq.run_once(_job_manifestation, when=at + timedelta(minutes=idx), name=f"at_manifestation_{idx}", data={"idx": idx})
 
     # Also schedule card prompt + reveal around the same window
     jq.run_once(_job_card_prompt, when=at + timedelta(minutes=3), name="at_card_prompt")
@@ -1,8 +1,17 @@
 import os
+import asyncio
 import json
 import random
+import threading
 from datetime import datetime
 
+# Optional: faster JSON via orjson (falls back to stdlib json)
+try:
+    import orjson  # type: ignore
+    _loads = orjson.loads
+except Exception:
+    _loads = json.loads
+
 # Load CHAT_ID safely
 chat_id_raw = os.getenv("CHAT_ID")
 if not chat_id_raw:
@@ -11,71 +20,156 @@ CHAT_ID = int(chat_id_raw)
 
 # ----------- Manifestation System ------------
 
+# Parsed JSON files keyed by path: (mtime_ns, data)
+_json_cache = {}
+
+def _load_json_cached(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = _loads(f.read())
+    _json_cache[path] = (mtime, data)
+    return data
+
+# Id index over the cached manifest list, rebuilt when the list is reloaded
+_ALL_BY_ID = {}
+_ALL_IDS = frozenset()
+_indexed_manifest = None
+
 def load_manifest():
-    with open("data/manifest_log.json") as f:
-        return json.load(f)
+    global _ALL_BY_ID, _ALL_IDS, _indexed_manifest
+    data = _load_json_cached("data/manifest_log.json")
+    if data is not _indexed_manifest:
+        _ALL_BY_ID = {m["id"]: m for m in data}
+        _ALL_IDS = frozenset(_ALL_BY_ID)
+        _indexed_manifest = data
+    return data
 
-def get_used_ids():
-    path = "data/used_ids.json"
-    if not os.path.exists(path):
+# Append-only log: one JSON-encoded id per line
+USED_IDS_FILE = "data/used_ids.jsonl"
+
+def _read_used_log():
+    try:
+        with open(USED_IDS_FILE) as f:
+            return [line for line in f if line.strip()]
+    except FileNotFoundError:
         return []
-    with open(path) as f:
-        return json.load(f)
+
+# In-memory copy of the used-id log, populated on first use
+_USED_IDS = None
+_used_log_lines = 0
+
+def get_used_ids():
+    global _USED_IDS, _used_log_lines
+    if _USED_IDS is None:
+        lines = _read_used_log()
+        _USED_IDS = {_loads(line) for line in lines}
+        _used_log_lines = len(lines)
+    return _USED_IDS
 
 def save_used_id(manifest_id):
-    used = get_used_ids()
-    used.append(manifest_id)
-    with open("data/used_ids.json", "w") as f:
-        json.dump(used, f)
+    global _used_log_lines
+    get_used_ids().add(manifest_id)
+    _used_log_lines += 1
+    with open(USED_IDS_FILE, "a") as f:
+        f.write(json.dumps(manifest_id) + "\n")
+
+def compact_used_ids(used_ids):
+    global _used_log_lines
+    # Rewrite the log with one line per id (atomic replace)
+    tmp = USED_IDS_FILE + ".tmp"
+    data = "".join(json.dumps(mid) + "\n" for mid in used_ids)
+    with open(tmp, "w") as f:
+        f.write(data)
+    os.replace(tmp, USED_IDS_FILE)
+    _used_log_lines = len(used_ids)
+
+# Random probes into the full pool before building the unused list
+PICK_PROBES = 8
+
+# (date, manifest) picked today; avoids disk reads for same-day sends
+_today_pick = None
+
+# Serializes picks; send_manifestation runs them in worker threads
+_PICK_LOCK = threading.Lock()
 
 def pick_new_manifest():
-    all_manifests = load_manifest()
-    used_ids = get_used_ids()
-    unused = [m for m in all_manifests if m["id"] not in used_ids]
-    if not unused:
-        print("⚠️ Manifestation pool exhausted!")
-        return None
-    chosen = random.choice(unused)
-    save_used_id(chosen["id"])
-    return chosen
-
-def send_manifestation(app, index):
-    manifest = app.bot_data.get("today_manifest")
-    if not manifest:
-        manifest = pick_new_manifest()
-        app.bot_data["today_manifest"] = manifest
+    global _today_pick
+    with _PICK_LOCK:
+        today = datetime.now().date()
+        if _today_pick and _today_pick[0] == today:
+            return _today_pick[1]
+
+        all_manifests = load_manifest()
+        used_ids = get_used_ids()
+        if _used_log_lines > 2 * len(all_manifests):
+            compact_used_ids(used_ids)
+        chosen = None
+        # Cheap while most of the pool is unused; fall back to the id set difference
+        if all_manifests:
+            for _ in range(PICK_PROBES):
+                m = all_manifests[random.randrange(len(all_manifests))]
+                if m["id"] not in used_ids:
+                    chosen = m
+                    break
+        if chosen is None:
+            candidates = _ALL_IDS - used_ids
+            if not candidates:
+                print("⚠️ Manifestation pool exhausted!")
+                return None
+            chosen = _ALL_BY_ID[random.choice(tuple(candidates))]
+        save_used_id(chosen["id"])
+        _today_pick = (today, chosen)
+        return chosen
+
+_MANIFEST_PREFIX = "🌅 Morning Manifestation:\n\n"
+
+async def send_manifestation(app, index):
+    # bot_data holds (date, manifest) so a long-running process re-picks each day
+    today = datetime.now().date()
+    cached = app.bot_data.get("today_manifest")
+    if not cached or cached[0] != today:
+        cached = (today, await asyncio.to_thread(pick_new_manifest))
+        app.bot_data["today_manifest"] = cached
+    manifest = cached[1]
 
     if manifest:
         msg = manifest["set"][index]
-        app.bot.send_message(chat_id=CHAT_ID, text=f"🌅 Morning Manifestation:\n\n{msg}")
+        await app.bot.send_message(chat_id=CHAT_ID, text=_MANIFEST_PREFIX + msg)
 
 # ----------- Card System ------------
 
-def send_card_prompt(app):
+def load_cards():
+    return _load_json_cached("data/card_templates.json")
+
+_CARD_PROMPT_MSG = (
+    "🃏 Your card for today is ready.\n\n"
+    "──────────────\n"
+    "     [ 🂠 ]\n"
+    "──────────────\n\n"
+    "You'll reveal it tonight at 7 PM IST."
+)
+
+_CARD_TMPL = (
+    "✨ Your Card: {title}\n\n"
+    "━━━━━━━━━━━━━━━━━━━━\n"
+    "{message}\n"
+    "━━━━━━━━━━━━━━━━━━━━\n\n"
+    "📝 Reflection Prompt:\n{prompt}"
+)
+
+async def send_card_prompt(app):
     app.bot_data["chosen_card"] = None
-    prompt_msg = (
-        "🃏 Your card for today is ready.\n\n"
-        "──────────────\n"
-        "     [ 🂠 ]\n"
-        "──────────────\n\n"
-        "You'll reveal it tonight at 7 PM IST."
-    )
-    app.bot.send_message(chat_id=CHAT_ID, text=prompt_msg)
-
-def send_card_reveal(app):
+    await app.bot.send_message(chat_id=CHAT_ID, text=_CARD_PROMPT_MSG)
+
+async def send_card_reveal(app):
     if "chosen_card" not in app.bot_data or app.bot_data["chosen_card"] is None:
-        with open("data/card_templates.json") as f:
-            cards = json.load(f)
-        chosen = random.choice(cards)
+        chosen = random.choice(load_cards())
         app.bot_data["chosen_card"] = chosen
     else:
         chosen = app.bot_data["chosen_card"]
 
-    card_text = (
-        f"✨ Your Card: {chosen['title']}\n\n"
-        "━━━━━━━━━━━━━━━━━━━━\n"
-        f"{chosen['message']}\n"
-        "━━━━━━━━━━━━━━━━━━━━\n\n"
-        f"📝 Reflection Prompt:\n{chosen['prompt']}"
-    )
-    app.bot.send_message(chat_id=CHAT_ID, text=card_text)
+    card_text = _CARD_TMPL.format_map(chosen)
+    await app.bot.send_message(chat_id=CHAT_ID, text=card_text)